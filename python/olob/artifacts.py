@@ -0,0 +1,47 @@
+# python/olob/artifacts.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+OUT_FORMATS = ("csv", "parquet")
+
+def artifact_suffix(out_format: str) -> str:
+    fmt = out_format.lower()
+    if fmt not in OUT_FORMATS:
+        raise ValueError(f"out_format must be one of {OUT_FORMATS}, got {out_format!r}")
+    return "." + fmt
+
+def write_frame(df: pd.DataFrame, path: Path, out_format: str = "csv") -> Path:
+    """Write a table artifact: CSV via DataFrame.to_csv (the historical artifact bytes), Parquet via Arrow with zstd."""
+    artifact_suffix(out_format)  # validate
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if out_format.lower() == "parquet":
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """Read back an artifact written by write_frame (format from suffix)."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, engine="pyarrow")
+    return pd.read_csv(path)
+
+def find_artifact(out_dir: Path, pattern: str) -> Optional[Path]:
+    """First file matching <pattern>.<fmt> in out_dir, trying OUT_FORMATS in order."""
+    for fmt in OUT_FORMATS:
+        cands = sorted(Path(out_dir).glob(pattern + artifact_suffix(fmt)))
+        if cands:
+            return cands[0]
+    return None
+
+def summary_fills_path(summary: Mapping[str, Any]) -> Optional[Path]:
+    """Fills artifact of a backtest summary; "fills_csv" is the pre-out_format key."""
+    p = summary.get("fills_path") or summary.get("fills_csv")
+    return Path(p) if p else None
@@ -1,34 +1,21 @@
 # python/olob/cli.py
 from __future__ import annotations
 
+import functools
+import json
 import os
 import shutil
 import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 
 import click
 
-# Day 8: crypto connectors
-from olob.crypto.binance import run_capture as _binance_capture
-from olob.crypto.common import normalize_day as _normalize_day
-
-# Analysis/report pipeline
-from olob import analyze as _analyze
-
-# Backtester (TWAP/VWAP/POV/Iceberg)
-from olob.backtest import run_backtest as _run_backtest
-
-# Sweep (parameter grid + parallel backtests)
-try:
-    from olob.sweep import run_sweep as _run_sweep  # provided by python/olob/sweep.py
-except Exception:
-    _run_sweep = None  # type: ignore
-
-from olob.crashsnapshot import run_replay_with_snapshot as _run_snapshot
-from olob.crashsnapshot import prove_equivalence as _prove_snapshot_equivalence
+# Command implementations (crypto connectors, analyze, backtest, sweep, crash
+# tools) pull in pandas/pyarrow/aiohttp, so each command imports its own
+# module on dispatch; `lob --help` and `lob bench` stay light.
 
 @click.group(help="LOB utilities")
 def cli() -> None:
@@ -39,6 +26,78 @@ def _existing(p: Path) -> Optional[str]:
     return str(p) if p.is_file() and os.access(p, os.X_OK) else None
 
 
+_BENCH_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "olob"
+
+
+def _repo_root() -> Path:
+    here = Path(__file__).resolve()
+    return here.parents[3] if (len(here.parents) >= 4 and (here.parents[3] / "cpp").exists()) else here.parents[2]
+
+
+# Build-tree directories that never contain the linked tool.
+_SKIP = {"CMakeFiles", "_deps", ".git", "__pycache__", "Testing", "cmake"}
+
+
+def _walk_for(name: str, root: Path) -> Iterator[str]:
+    """Yield the first executable file called `name` under `root` (scandir, skipping _SKIP)."""
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP:
+                            stack.append(entry.path)
+                    elif entry.name == name and entry.is_file() and os.access(entry.path, os.X_OK):
+                        yield entry.path
+                        return
+                except OSError:
+                    continue
+
+
+def _repo_candidates(repo: Path) -> Iterator[Path]:
+    # Lazy: the caller stops at the first executable hit, so an early match
+    # never pays for the rest of the candidates.
+    hit = next(_walk_for("bench_tool", repo / "_skbuild"), None)
+    if hit:
+        yield Path(hit)
+    yield repo / "build" / "cpp" / "bench_tool"
+    yield repo / "cpp" / "build" / "bench_tool"
+    yield Path(__file__).resolve().parent / "bench_tool"
+
+
+def _bench_cache_key(repo: Path) -> Dict[str, Any]:
+    try:
+        mtime = repo.stat().st_mtime
+    except OSError:
+        mtime = None
+    return {"prefix": sys.prefix, "repo_mtime": mtime}
+
+
+def _load_cached_bench_tool(key: Dict[str, Any]) -> Optional[str]:
+    try:
+        data = json.loads((_BENCH_CACHE_DIR / "bench_tool_path").read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or any(data.get(k) != v for k, v in key.items()):
+        return None
+    path = data.get("path")
+    return _existing(Path(path)) if isinstance(path, str) else None
+
+
+def _store_cached_bench_tool(key: Dict[str, Any], exe: str) -> None:
+    try:
+        _BENCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (_BENCH_CACHE_DIR / "bench_tool_path").write_text(json.dumps({**key, "path": exe}))
+    except OSError:
+        pass  # cache is best-effort
+
+
+@functools.lru_cache(maxsize=1)
 def _find_bench_tool() -> Optional[str]:
     exe = shutil.which("bench_tool")
     if exe:
@@ -48,18 +107,17 @@ def _find_bench_tool() -> Optional[str]:
     if exe:
         return exe
 
-    here = Path(__file__).resolve()
-    repo = here.parents[3] if (len(here.parents) >= 4 and (here.parents[3] / "cpp").exists()) else here.parents[2]
-    candidates: list[Path] = []
-    for p in repo.glob("_skbuild/*/*"):
-        if p.is_dir():
-            candidates.extend(p.rglob("bench_tool"))
-    candidates.append(repo / "build" / "cpp" / "bench_tool")
-    candidates.append(repo / "cpp" / "build" / "bench_tool")
-    candidates.append(here.parent / "bench_tool")
-    for c in candidates:
+    # Repo build trees: reuse the path found by a previous run while the
+    # interpreter prefix and repo root mtime are unchanged.
+    repo = _repo_root()
+    key = _bench_cache_key(repo)
+    exe = _load_cached_bench_tool(key)
+    if exe:
+        return exe
+    for c in _repo_candidates(repo):
         exe = _existing(c)
         if exe:
+            _store_cached_bench_tool(key, exe)
             return exe
 
     env = os.getenv("LOB_BENCH")
@@ -68,6 +126,42 @@ def _find_bench_tool() -> Optional[str]:
     return None
 
 
+def _bench_exe_identity(exe: str) -> Dict[str, Any]:
+    st = os.stat(exe)
+    return {"exe": exe, "mtime": st.st_mtime, "size": st.st_size}
+
+
+def _load_cached_bench_argv(exe: str) -> Optional[Dict[str, Any]]:
+    """Cached {"argv", "verified", ...} entry if it was recorded for this exact binary (path, mtime, size)."""
+    try:
+        data = json.loads((_BENCH_CACHE_DIR / "bench_argv.json").read_text())
+        ident = _bench_exe_identity(exe)
+        if isinstance(data, dict) and all(data.get(k) == v for k, v in ident.items()):
+            argv = data.get("argv")
+            if isinstance(argv, list) and all(isinstance(a, str) for a in argv):
+                return data
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _store_cached_bench_argv(exe: str, argv: List[str], verified: bool = False) -> None:
+    try:
+        _BENCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (_BENCH_CACHE_DIR / "bench_argv.json").write_text(
+            json.dumps({**_bench_exe_identity(exe), "argv": argv, "verified": verified})
+        )
+    except OSError:
+        pass  # cache is best-effort
+
+
+def _drop_cached_bench_argv() -> None:
+    try:
+        (_BENCH_CACHE_DIR / "bench_argv.json").unlink()
+    except OSError:
+        pass
+
+
 @cli.command("bench", help="Run the native C++ bench tool with --msgs.")
 @click.option("--msgs", type=float, default=1e6, show_default=True, help="Number of messages")
 def bench(msgs: float) -> None:
@@ -83,17 +177,40 @@ def bench(msgs: float) -> None:
         raise click.Abort()
 
     n = str(int(msgs))
-    trials = [
-        [exe, "--msgs", n],
-        [exe, "--num", n],
-        [exe, "-n", n],
-        [exe, n],
+    forms = [
+        ["--msgs", "{msgs}"],
+        ["--num", "{msgs}"],
+        ["-n", "{msgs}"],
+        ["{msgs}"],
     ]
+    trials = [[exe] + [a.replace("{msgs}", n) for a in f] for f in forms]
+
+    # Hot path: reuse the form that last worked for this exact binary. It runs
+    # as a child first so a failure can still fall back to probing; once it has
+    # also succeeded from the cache it is known-good and replaces this process.
+    cached = _load_cached_bench_argv(exe)
+    if cached is not None:
+        form = cached["argv"]
+        args = [exe] + [a.replace("{msgs}", n) for a in form]
+        if cached.get("verified") is True and os.name != "nt":
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execv(exe, args)
+        if subprocess.call(args) == 0:
+            if cached.get("verified") is not True:
+                _store_cached_bench_argv(exe, form, verified=True)
+            return
+        # Wrong or stale form: forget it and probe the others
+        _drop_cached_bench_argv()
+        forms_trials = [(f, a) for f, a in zip(forms, trials) if f != form]
+    else:
+        forms_trials = list(zip(forms, trials))
 
     last_err: Optional[subprocess.CalledProcessError] = None
-    for args in trials:
+    for form, args in forms_trials:
         try:
             subprocess.check_call(args)
+            _store_cached_bench_argv(exe, form)
             return
         except subprocess.CalledProcessError as e:
             last_err = e
@@ -121,6 +238,8 @@ def bench(msgs: float) -> None:
 @click.option("--raw-dir", default="raw", show_default=True)
 @click.option("--snapshot-every-sec", default=600, show_default=True, type=int)
 def crypto_capture(exchange: str, symbol: str, minutes: int, raw_dir: str, snapshot_every_sec: int) -> None:
+    from olob.crypto.binance import run_capture as _binance_capture
+
     _binance_capture(
         symbol=symbol.upper(),
         minutes=minutes,
@@ -138,6 +257,8 @@ def crypto_capture(exchange: str, symbol: str, minutes: int, raw_dir: str, snaps
 @click.option("--raw-dir", default="raw", show_default=True)
 @click.option("--out-dir", default="parquet", show_default=True)
 def normalize(exchange: str, date: Optional[str], symbol: str, raw_dir: str, out_dir: str) -> None:
+    from olob.crypto.common import normalize_day as _normalize_day
+
     day = date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
     _normalize_day(
         date_str=day,
@@ -166,6 +287,8 @@ def normalize(exchange: str, date: Optional[str], symbol: str, raw_dir: str, out
 @click.option("--depth-top10", default=None, help="Optional path to L2 top-10 depth parquet")
 def analyze(exchange, symbol, date, hour_start, parquet_dir, build_dir,
             out_reports, tmp, cadence_ms, speed, depth_top10):
+    from olob import analyze as _analyze
+
     out = _analyze.run_pipeline(
         exchange=exchange,
         symbol=symbol,
@@ -195,6 +318,9 @@ def analyze(exchange, symbol, date, hour_start, parquet_dir, build_dir,
 @click.option("--seed", default=42, show_default=True, type=int, help="Deterministic RNG seed")
 def backtest(strategy: str, quotes: Optional[str], file: Optional[str],
              trades: Optional[str], out_dir: str, seed: int) -> None:
+    from olob.backtest import run_backtest as _run_backtest
+    from olob.artifacts import summary_fills_path as _summary_fills_path
+
     qpath = quotes or file
     if not qpath:
         click.secho("Provide --quotes or --file (quotes CSV).", fg="red")
@@ -209,15 +335,69 @@ def backtest(strategy: str, quotes: Optional[str], file: Optional[str],
                             out_dir=str(out),
                             seed=int(seed))
 
-    fills_path = summary.get("fills_csv")
-    summary_path = Path(fills_path).with_name(
-        Path(fills_path).stem.replace("_fills", "_summary") + ".json"
+    fills_path = _summary_fills_path(summary)
+    summary_path = fills_path.with_name(
+        fills_path.stem.replace("_fills", "_summary") + ".json"
     ) if fills_path else (out / (Path(strategy).stem + "_summary.json"))
 
     click.secho(f"[fills]   {fills_path}", fg="green")
     click.secho(f"[summary] {summary_path}", fg="green")
 
 
+def _backtest_one(job: tuple) -> Dict[str, Any]:
+    # Top-level so ProcessPoolExecutor can pickle it
+    from olob.backtest import run_backtest as _run_backtest
+
+    strategy, quotes, trades, out_dir, seed = job
+    return _run_backtest(strategy_yaml=strategy, quotes_csv=quotes, trades_csv=trades,
+                         out_dir=out_dir, seed=seed)
+
+
+@cli.command("backtest-sweep", help="Run every strategy YAML in a directory as parallel backtests.")
+@click.option("--strategy-dir", required=True, type=click.Path(file_okay=False, exists=True, path_type=Path),
+              help="Directory of strategy YAMLs (e.g., docs/strategy)")
+@click.option("--quotes", required=True, help="TAQ quotes CSV (shared by all runs)")
+@click.option("--trades", required=False, help="TAQ trades CSV (for VWAP/POV weights)")
+@click.option("--out", "out_root", required=True, type=click.Path(file_okay=False, path_type=Path),
+              help="Output root; each strategy writes to <out>/<yaml stem>")
+@click.option("--seed", default=42, show_default=True, type=int, help="Deterministic RNG seed")
+@click.option("--max-procs", type=int, default=None, help="Worker processes (default: CPU count)")
+def backtest_sweep(strategy_dir: Path, quotes: str, trades: Optional[str], out_root: Path,
+                   seed: int, max_procs: Optional[int]) -> None:
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from olob.backtest import prime_input_cache as _prime_input_cache
+
+    yamls = sorted(list(strategy_dir.glob("*.yaml")) + list(strategy_dir.glob("*.yml")))
+    if not yamls:
+        click.secho(f"No strategy YAMLs found in {strategy_dir}", fg="red")
+        raise click.Abort()
+
+    # Parse inputs once; workers then load the shared Parquet cache instead of re-parsing CSV
+    _prime_input_cache(str(quotes), str(trades) if trades else None)
+
+    out_root.mkdir(parents=True, exist_ok=True)
+    jobs = {y: (str(y), str(quotes), str(trades) if trades else None, str(out_root / y.stem), int(seed))
+            for y in yamls}
+    workers = max(1, min(len(jobs), max_procs or os.cpu_count() or 1))
+    click.secho(f"[backtest-sweep] {len(jobs)} strategies, {workers} workers", fg="cyan")
+
+    failed: List[Path] = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futs = {ex.submit(_backtest_one, job): y for y, job in jobs.items()}
+        for fut in as_completed(futs):
+            y = futs[fut]
+            try:
+                summary = fut.result()
+                click.secho(f"[ok] {y.name} -> {summary.get('fills_path')}", fg="green")
+            except Exception as e:
+                failed.append(y)
+                click.secho(f"[FAIL] {y.name}: {e}", fg="red")
+
+    if failed:
+        click.secho(f"[backtest-sweep] {len(failed)}/{len(jobs)} runs failed", fg="red")
+        raise click.Abort()
+
+
 # ---------------------------
 # Sweep (parameter grid + parallel backtests)
 # ---------------------------
@@ -238,6 +418,10 @@ def sweep(grid_path: Path,
           metric: Optional[str],
           topk: Optional[int],
           resume: bool) -> None:
+    try:
+        from olob.sweep import run_sweep as _run_sweep  # provided by python/olob/sweep.py
+    except Exception:
+        _run_sweep = None  # type: ignore
     if _run_sweep is None:
         click.secho("Sweep module not available. Ensure python/olob/sweep.py exists and imports correctly.", fg="red")
         raise click.Abort()
@@ -346,8 +530,6 @@ def sweep(grid_path: Path,
 # Crash recovery check
 # ---------------------------
 
-from olob.crashcheck import run_crash_check as _run_crash_check
-
 @cli.command("crash-check", help="Prove two-phase (crash->resume) equals single-pass fills (TWAP recommended).")
 @click.option("--strategy", required=True, help="YAML config (e.g., docs/strategy/twap.yaml)")
 @click.option("--quotes", required=True, help="TAQ quotes CSV")
@@ -358,6 +540,8 @@ from olob.crashcheck import run_crash_check as _run_crash_check
 @click.option("--seed", default=123, show_default=True, type=int)
 def crash_check_cmd(strategy: str, quotes: str, trades: Optional[str],
                     out_dir: str, bar_sec: int, cut_pct: float, seed: int) -> None:
+    from olob.crashcheck import run_crash_check as _run_crash_check
+
     res = _run_crash_check(strategy_yaml=strategy,
                            quotes_csv=quotes,
                            trades_csv=trades,
@@ -380,6 +564,9 @@ def crash_check_cmd(strategy: str, quotes: str, trades: Optional[str],
 @click.option("--out", "out_dir", required=True, help="Output dir for artifacts")
 @click.option("--strategy", required=False, help="YAML strategy (TWAP recommended)")
 def snapshot_proof_cmd(events_csv: str, cut_ns: int, out_dir: str, strategy: str | None) -> None:
+    from olob.crashsnapshot import run_replay_with_snapshot as _run_snapshot
+    from olob.crashsnapshot import prove_equivalence as _prove_snapshot_equivalence
+
     artifacts = _run_snapshot(events_csv=events_csv, cut_ns=cut_ns, out_dir=out_dir)
     click.secho(f"[ok] snapshot -> {artifacts['snap']}", fg="green")
     if strategy:
@@ -11,6 +11,7 @@ import pandas as pd
 import yaml
 
 from .backtest import run_backtest as _run_backtest
+from .artifacts import find_artifact, read_frame
 
 @dataclass
 class CrashCheckResult:
@@ -140,12 +141,12 @@ def _slice_csv_by_time(in_csv: Path, out_csv: Path,
 # Fills reader + comparator
 # ---------------------------
 
-def _fills_csv_for(out_dir: Path) -> Optional[Path]:
-    cands = sorted(out_dir.glob("*_fills.csv"))
-    return cands[0] if cands else None
+def _fills_for(out_dir: Path) -> Optional[Path]:
+    # *_fills.csv or *_fills.parquet, per the strategy's out_format
+    return find_artifact(out_dir, "*_fills")
 
 def _read_fills(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    df = read_frame(path)
 
     # normalize timestamp to ts_ns(int64, UTC)
     ts_col = _find_ts_col(df)
@@ -242,7 +243,7 @@ def run_crash_check(strategy_yaml: str,
                       trades_csv=str(trades_csv) if trades_csv else None,
                       out_dir=str(ref_dir),
                       seed=int(seed))
-    ref_fills = _fills_csv_for(ref_dir)
+    ref_fills = _fills_for(ref_dir)
     if ref_fills is None:
         return CrashCheckResult(False, ref_dir, partA_dir, partB_dir, "reference fills missing")
     df_ref = _read_fills(ref_fills)
@@ -356,7 +357,7 @@ def run_crash_check(strategy_yaml: str,
                       trades_csv=str(tradesA) if tradesA else None,
                       out_dir=str(partA_dir),
                       seed=int(seed))
-    fillsA = _fills_csv_for(partA_dir)
+    fillsA = _fills_for(partA_dir)
     if fillsA is None:
         return CrashCheckResult(False, ref_dir, partA_dir, partB_dir, "partA fills missing")
 
@@ -366,7 +367,7 @@ def run_crash_check(strategy_yaml: str,
                       trades_csv=str(tradesB) if tradesB else None,
                       out_dir=str(partB_dir),
                       seed=int(seed))
-    fillsB = _fills_csv_for(partB_dir)
+    fillsB = _fills_for(partB_dir)
     if fillsB is None:
         return CrashCheckResult(False, ref_dir, partA_dir, partB_dir, "partB fills missing")
 
@@ -131,6 +131,7 @@ def prove_equivalence(
         )
 
     from olob.backtest import run_backtest as _run_backtest
+    from olob.artifacts import read_frame, summary_fills_path
 
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
@@ -145,7 +146,7 @@ def prove_equivalence(
         out_dir=str(outA),
         seed=int(seed),
     )
-    fills_A = Path(a_sum["fills_csv"])
+    fills_A = summary_fills_path(a_sum)
 
     # B (resume)
     outB = out / "B"
@@ -157,15 +158,15 @@ def prove_equivalence(
         out_dir=str(outB),
         seed=int(seed),
     )
-    fills_B = Path(b_sum["fills_csv"])
+    fills_B = summary_fills_path(b_sum)
 
     # Prefer a repo helper if you have one; else strict equality
     try:
         from olob.crashcheck import compare_fills  # optional helper
         ok, msg = compare_fills(str(fills_A), str(fills_B))
     except Exception:
-        ca = pd.read_csv(fills_A)
-        cb = pd.read_csv(fills_B)
+        ca = read_frame(fills_A)
+        cb = read_frame(fills_B)
         cols = [c for c in ca.columns if c in cb.columns]
         ok = ca[cols].equals(cb[cols])
         msg = "strict equality on shared columns" if ok else "fills differ"
@@ -1,40 +1,95 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import gzip
 import json
 import os
+import ssl
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import aiohttp
+import certifi
 from aiohttp import ClientResponseError, ClientConnectorError, WSMsgType
 
+# Optional fast JSON (pip install orjson); stdlib fallback keeps the same compact output
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+if _orjson is not None:
+    _loads = _orjson.loads
+    _dumps = _orjson.dumps
+else:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# Optional libuv event loop (pip install uvloop); aiohttp runs unchanged on it
+try:
+    import uvloop as _uvloop
+except ImportError:
+    _uvloop = None
+
+# Optional ISA-L deflate (pip install isal); output is plain gzip either way
+try:
+    from isal import igzip as _gzip
+except ImportError:
+    _gzip = gzip
+
 # ---------- config helpers ----------
 
-@dataclass
+@dataclass(frozen=True)
 class Endpoints:
     rest_base: str
     ws_base: str  # combined stream endpoint
 
+_ENDPOINTS = {
+    # US endpoints
+    "binanceus": Endpoints(
+        rest_base="https://api.binance.us",
+        ws_base="wss://stream.binance.us:9443/stream",
+    ),
+    # Global endpoints
+    "binance": Endpoints(
+        rest_base="https://api.binance.com",
+        ws_base="wss://stream.binance.com/stream",
+    ),
+}
+
 def _endpoints_for(exchange: str) -> Endpoints:
-    ex = exchange.lower()
-    if ex == "binanceus":
-        # US endpoints
-        return Endpoints(
-            rest_base="https://api.binance.us",
-            ws_base="wss://stream.binance.us:9443/stream",
-        )
-    elif ex == "binance":
-        # Global endpoints
-        return Endpoints(
-            rest_base="https://api.binance.com",
-            ws_base="wss://stream.binance.com/stream",
-        )
-    else:
-        raise ValueError(f"Unknown exchange: {exchange}")
+    try:
+        return _ENDPOINTS[exchange.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown exchange: {exchange}") from None
+
+@functools.lru_cache(maxsize=4)
+def _ssl_ctx_for(cafile: Optional[str]) -> ssl.SSLContext:
+    # Loading a CA store costs tens of ms; build each context once per process
+    # (None = system trust store)
+    ctx = ssl.create_default_context(cafile=cafile)
+    try:
+        # Restricts TLS 1.2 to ECDHE + AES-GCM suites (AES-NI/PCLMULQDQ); TLS 1.3
+        # suites are configured separately and unaffected
+        ctx.set_ciphers("ECDHE+AESGCM")
+    except ssl.SSLError:
+        pass
+    return ctx
+
+def _make_ssl_context() -> ssl.SSLContext:
+    """
+    TLS context for REST + WS, verified against the system trust store.
+    LOB_CA_BUNDLE overrides the CAs: a bundle path, or "certifi" for certifi's bundle.
+    """
+    cafile = os.getenv("LOB_CA_BUNDLE") or None
+    if cafile == "certifi":
+        cafile = certifi.where()
+    return _ssl_ctx_for(cafile)
 
 # ---------- filesystem helpers ----------
 
@@ -49,16 +104,25 @@ def _ensure_dir(p: Path) -> None:
 
 class JsonlGzWriter:
     def __init__(self, path: Path):
-        _ensure_dir(path.parent)
-        # Use binary file object with gzip and write bytes
-        self._f = gzip.open(str(path), mode="wt", encoding="utf-8")
+        # path.parent is created once per capture by the consumer
+        # Use binary file object with gzip and write bytes; level 1 keeps
+        # deflate cheap on a stream that is mostly repeated keys/prices
+        self._f = _gzip.open(str(path), mode="wb", compresslevel=1)
         self._path = path
         self._count = 0
 
     def write(self, obj) -> None:
-        self._f.write(json.dumps(obj, separators=(",", ":")) + "\n")
+        self.write_line(_dumps(obj))
+
+    def write_line(self, line: bytes) -> None:
+        self._f.write(line + b"\n")
         self._count += 1
 
+    def write_many(self, lines: List[bytes]) -> None:
+        # one compressor call per batch instead of one per frame
+        self._f.write(b"\n".join(lines) + b"\n")
+        self._count += len(lines)
+
     @property
     def count(self) -> int:
         return self._count
@@ -75,12 +139,13 @@ class JsonlGzWriter:
 
 class JsonGzWriter:
     def __init__(self, path: Path):
-        _ensure_dir(path.parent)
-        self._f = gzip.open(str(path), mode="wt", encoding="utf-8")
+        # path.parent is created once per capture by the consumer
+        # Level 3: ~level-6 ratio on depth JSON at a fraction of the deflate time
+        self._f = _gzip.open(str(path), mode="wb", compresslevel=3)
         self._path = path
 
     def write_obj(self, obj) -> None:
-        self._f.write(json.dumps(obj, separators=(",", ":")))
+        self._f.write(_dumps(obj))
 
     def close(self) -> None:
         try:
@@ -88,6 +153,89 @@ class JsonGzWriter:
         except Exception:
             pass
 
+_MAX_BATCH = 64          # frames per writer hand-off
+_MAX_BATCH_AGE = 0.020   # seconds a partial batch may wait
+
+class _LineBatch:
+    """Groups encoded frames so the writer thread gets one hand-off per burst."""
+
+    def __init__(self, q: "asyncio.Queue[Optional[List[bytes]]]", writer: "asyncio.Task[None]"):
+        self._q = q
+        self._writer = writer
+        self._lines: List[bytes] = []
+        self._t0 = 0.0
+
+    async def add(self, line: bytes, now: float) -> None:
+        if not self._lines:
+            self._t0 = now
+        self._lines.append(line)
+        if len(self._lines) >= _MAX_BATCH:
+            await self.flush()
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """Loop time by which the pending batch must be handed off (None when empty)."""
+        return self._t0 + _MAX_BATCH_AGE if self._lines else None
+
+    async def flush_if_stale(self, now: float) -> None:
+        if self._lines and now - self._t0 >= _MAX_BATCH_AGE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._lines:
+            lines, self._lines = self._lines, []
+            await self._put(lines)
+
+    async def close(self) -> None:
+        """Hand off what is buffered, then the sentinel that stops the writer."""
+        await self.flush()
+        await self._put(None)
+
+    def _check_writer(self) -> None:
+        # a dead writer never drains the queue; end the capture with its error
+        if self._writer.done():
+            raise self._writer.exception() or RuntimeError("capture writer stopped")
+
+    async def _put(self, item: Optional[List[bytes]]) -> None:
+        self._check_writer()
+        try:
+            self._q.put_nowait(item)
+        except asyncio.QueueFull:
+            # writer is behind: wait for room, unless it fails meanwhile
+            put = asyncio.ensure_future(self._q.put(item))
+            await asyncio.wait({put, self._writer}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                self._check_writer()
+
+async def _writer_worker(q: "asyncio.Queue[Optional[List[bytes]]]", writer: JsonlGzWriter) -> None:
+    """Drain batches of encoded lines into `writer` on a worker thread until a None sentinel."""
+    while True:
+        lines = await q.get()
+        if lines is None:
+            return
+        await asyncio.to_thread(writer.write_many, lines)
+
+def _write_snapshot_sync(path: Path, snap: dict) -> None:
+    out = JsonGzWriter(path)
+    try:
+        out.write_obj(snap)
+    finally:
+        out.close()
+
+def _raw_line(frame, obj) -> bytes:
+    """The frame as received, for one JSONL line; re-encode only if it spans lines."""
+    raw = frame.encode("utf-8") if isinstance(frame, str) else frame
+    if b"\n" in raw or b"\r" in raw:
+        return _dumps(obj)
+    return raw
+
+async def _persist_snapshot(depth_dir: Path, snap: dict) -> Path:
+    # Encoding + deflate of a 1000-level book takes ms; keep it off the event loop
+    snap_path = depth_dir / f"snapshot-{_utc_hms()}.json.gz"
+    await asyncio.to_thread(_write_snapshot_sync, snap_path, snap)
+    return snap_path
+
 # ---------- REST snapshot ----------
 
 async def _rest_depth_snapshot(session: aiohttp.ClientSession, rest_base: str, symbol: str) -> dict:
@@ -110,17 +258,34 @@ async def _rest_depth_snapshot(session: aiohttp.ClientSession, rest_base: str, s
     except ClientConnectorError as e:
         raise RuntimeError(f"REST connect error: {e}") from e
     
+async def _snapshot_job(session: aiohttp.ClientSession, rest_base: str, symbol: str, depth_dir: Path) -> Path:
+    snap = await _rest_depth_snapshot(session, rest_base, symbol)
+    return await _persist_snapshot(depth_dir, snap)
+
+def _report_snapshot(task: "asyncio.Task[Path]") -> None:
+    if task.cancelled():
+        return
+    try:
+        print(f"[capture] wrote snapshot -> {task.result().name}")
+    except Exception as e:
+        print(f"[capture][WARN] snapshot failed: {e}")
+
 def run_capture(*, symbol: str, minutes: int, raw_root: str, snapshot_every_sec: int, exchange: str) -> None:
     """
     Wrapper so olob.cli can call into this module.
     """
-    asyncio.run(_consumer_depth_and_trades(
+    main = _consumer_depth_and_trades(
         symbol=symbol,
         raw_root=raw_root,
         minutes=minutes,
         snapshot_every_sec=snapshot_every_sec,
         exchange=exchange,
-    ))
+    )
+    if _uvloop is not None:
+        # own uvloop loop for this run; the global event loop policy is left alone
+        _uvloop.run(main)
+    else:
+        asyncio.run(main)
 
 # ---------- WS consumer ----------
 
@@ -139,6 +304,7 @@ async def _consumer_depth_and_trades(
     base = Path(raw_root) / date / exchange / symbol.upper()
     depth_dir = base / "depth"
     trades_dir = base / "trades"
+    # every file of the run (diffs, trades, snapshots) lands in these two dirs
     _ensure_dir(depth_dir)
     _ensure_dir(trades_dir)
 
@@ -155,69 +321,123 @@ async def _consumer_depth_and_trades(
     print(f"[capture] writing diffs -> {depth_out.path}")
     print(f"[capture] writing trades -> {trades_out.path}")
 
-    stop_at = asyncio.get_event_loop().time() + minutes * 60
+    # One monotonic clock for the whole run; nothing below touches wall time per message
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + minutes * 60
     last_snapshot = 0.0
+    snap_task: "Optional[asyncio.Task[Path]]" = None
+
+    # Compression runs on worker threads fed by bounded queues of micro-batches,
+    # so a slow deflate never stalls the socket reads
+    depth_q: "asyncio.Queue[Optional[List[bytes]]]" = asyncio.Queue(maxsize=1024)
+    trades_q: "asyncio.Queue[Optional[List[bytes]]]" = asyncio.Queue(maxsize=1024)
+    workers = [
+        asyncio.create_task(_writer_worker(depth_q, depth_out)),
+        asyncio.create_task(_writer_worker(trades_q, trades_out)),
+    ]
+    depth_batch, trades_batch = _LineBatch(depth_q, workers[0]), _LineBatch(trades_q, workers[1])
+    n_diffs = n_trades = 0
+
+    try:
+        # DNS answers are cached for the run, so periodic REST snapshots skip
+        # the resolver
+        connector = aiohttp.TCPConnector(ssl=_make_ssl_context(), use_dns_cache=True, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, raise_for_status=True) as session:
+            # initial snapshot immediately, overlapped with the WS handshake;
+            # frames arriving meanwhile queue in the socket and are read below
+            snap_task = asyncio.create_task(_snapshot_job(session, ep.rest_base, symbol, depth_dir))
+            snap_task.add_done_callback(_report_snapshot)
+            last_snapshot = loop.time()
+
+            async with session.ws_connect(ws_url, heartbeat=20) as ws:
+                while True:
+                    # periodic snapshot: the REST round-trip runs as a task while
+                    # the socket keeps draining; at most one in flight
+                    now = loop.time()
+                    in_flight = snap_task is not None and not snap_task.done()
+                    if not in_flight and now - last_snapshot >= float(snapshot_every_sec):
+                        snap_task = asyncio.create_task(
+                            _snapshot_job(session, ep.rest_base, symbol, depth_dir))
+                        snap_task.add_done_callback(_report_snapshot)
+                        last_snapshot = now
+
+                    # stop condition
+                    if now >= stop_at:
+                        break
+
+                    await depth_batch.flush_if_stale(now)
+                    await trades_batch.flush_if_stale(now)
 
-    async with aiohttp.ClientSession(raise_for_status=True) as session:
-        # initial snapshot immediately
-        try:
-            snap = await _rest_depth_snapshot(session, ep.rest_base, symbol)
-            snap_path = depth_dir / f"snapshot-{_utc_hms()}.json.gz"
-            JsonGzWriter(snap_path).write_obj(snap)
-            print(f"[capture] wrote snapshot -> {snap_path.name}")
-        except Exception as e:
-            print(f"[capture][WARN] initial snapshot failed: {e}")
-
-        async with session.ws_connect(ws_url, heartbeat=20) as ws:
-            while True:
-                # periodic snapshot
-                now = asyncio.get_event_loop().time()
-                if now - last_snapshot >= float(snapshot_every_sec):
                     try:
-                        snap = await _rest_depth_snapshot(session, ep.rest_base, symbol)
-                        snap_path = depth_dir / f"snapshot-{_utc_hms()}.json.gz"
-                        JsonGzWriter(snap_path).write_obj(snap)
-                        print(f"[capture] wrote snapshot -> {snap_path.name}")
-                    except Exception as e:
-                        print(f"[capture][WARN] snapshot failed: {e}")
-                    last_snapshot = now
-
-                # stop condition
-                if now >= stop_at:
-                    break
-
-                msg = await ws.receive(timeout=30)
-                if msg.type == WSMsgType.CLOSED:
-                    print("[capture] WS closed by server")
-                    break
-                if msg.type == WSMsgType.ERROR:
-                    print(f"[capture] WS error: {ws.exception()}")
-                    break
-                if msg.type != WSMsgType.TEXT:
-                    continue
-
-                try:
-                    obj = json.loads(msg.data)
-                except Exception:
-                    continue
-
-                # Combined stream wrapper: {"stream": "...", "data": {...}}
-                data = obj.get("data", obj)
-
-                # depth diffs
-                if data.get("e") == "depthUpdate":
-                    depth_out.write(obj)  # keep the wrapper; recon can unwrap
-                    if depth_out.count % 500 == 0:
-                        print(f"[capture] diffs written: {depth_out.count}")
-
-                # trades
-                elif data.get("e") in ("trade", "aggTrade", "aggTradeUpdate"):
-                    trades_out.write(obj)
-                    if trades_out.count % 500 == 0:
-                        print(f"[capture] trades written: {trades_out.count}")
-
-    depth_out.close()
-    trades_out.close()
+                        # wake for the stop time, the next snapshot or a pending
+                        # batch's age limit even if the stream is quiet
+                        wait = min(30.0, stop_at - now)
+                        due = last_snapshot + snapshot_every_sec
+                        if due > now:
+                            wait = min(wait, due - now)
+                        for deadline in (depth_batch.deadline, trades_batch.deadline):
+                            if deadline is not None:
+                                wait = min(wait, deadline - now)
+                        msg = await ws.receive(timeout=wait)
+                    except asyncio.TimeoutError:
+                        # quiet stream: hand off partial batches, re-check snapshot/stop;
+                        # heartbeat guards the socket
+                        await depth_batch.flush()
+                        await trades_batch.flush()
+                        continue
+                    if msg.type == WSMsgType.CLOSED:
+                        print("[capture] WS closed by server")
+                        break
+                    if msg.type == WSMsgType.ERROR:
+                        print(f"[capture] WS error: {ws.exception()}")
+                        break
+                    if msg.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                        continue
+
+                    try:
+                        obj = _loads(msg.data)
+                    except Exception:
+                        continue
+
+                    # Combined stream wrapper: {"stream": "...", "data": {...}}
+                    data = obj.get("data", obj)
+                    t = loop.time()
+
+                    # depth diffs
+                    if data.get("e") == "depthUpdate":
+                        # keep the wrapper; recon can unwrap
+                        await depth_batch.add(_raw_line(msg.data, obj), t)
+                        n_diffs += 1
+                        if n_diffs % 500 == 0:
+                            print(f"[capture] diffs written: {n_diffs}")
+
+                    # trades
+                    elif data.get("e") in ("trade", "aggTrade", "aggTradeUpdate"):
+                        await trades_batch.add(_raw_line(msg.data, obj), t)
+                        n_trades += 1
+                        if n_trades % 500 == 0:
+                            print(f"[capture] trades written: {n_trades}")
+
+            # let an in-flight snapshot land before the session closes
+            if snap_task is not None and not snap_task.done():
+                await asyncio.wait([snap_task])
+    finally:
+        if snap_task is not None and not snap_task.done():
+            snap_task.cancel()
+        # flush everything buffered/queued before closing the files; every live
+        # writer gets its sentinel even if another one has failed
+        for batch in (depth_batch, trades_batch):
+            try:
+                await batch.close()
+            except Exception:
+                pass  # that writer's own error is raised below
+        results = await asyncio.gather(*workers, return_exceptions=True)
+        depth_out.close()
+        trades_out.close()
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+
     print(f"[capture] done. diffs={depth_out.count} trades={trades_out.count}")
     if depth_out.count == 0:
         print("[capture][WARN] no diffs captured; check WS connectivity and symbol.")
@@ -2,12 +2,41 @@
 from __future__ import annotations
 import os, json, gzip
 from pathlib import Path
-from typing import Iterable, Dict, Any, List
+from typing import Iterable, Dict, Any, List, Optional, Union
 from datetime import datetime, timezone
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+# Optional typed decoding (pip install msgspec): frames parse straight into
+# structs holding only the fields normalization reads, not a dict tree per line
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    # Tagged on "e". Required fields are the ones the dict path indexes, so a
+    # frame missing them fails validation and takes the dict path (which raises)
+    class _DepthUpdate(msgspec.Struct, tag_field="e", tag="depthUpdate"):
+        E: int
+        b: List[List[str]] = []
+        a: List[List[str]] = []
+
+    class _Trade(msgspec.Struct, tag_field="e", tag="trade"):
+        T: int
+        p: str
+        q: str
+        m: bool = False
+
+    _BinanceEvent = Union[_DepthUpdate, _Trade]
+
+    class _BinanceFrame(msgspec.Struct):
+        data: Optional[_BinanceEvent] = None
+
+    _frame_decoder = msgspec.json.Decoder(_BinanceFrame)
+    _event_decoder = msgspec.json.Decoder(_BinanceEvent)
+
 # ---------- path helpers ----------
 def dpath(root: str, date_str: str, *parts: str) -> Path:
     p = Path(root) / date_str
@@ -59,24 +88,55 @@ def _iter_jsonl_gz(paths: Iterable[Path]) -> Iterable[Dict[str, Any]]:
                 if line.strip():
                     yield json.loads(line)
 
-def _book_rows_from_binance_event(ev: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+def _decode_event(line: bytes) -> Union["_BinanceEvent", Dict[str, Any]]:
+    # Typed fast path; anything off-schema falls back to a plain dict
+    try:
+        ev = _frame_decoder.decode(line).data
+        return ev if ev is not None else _event_decoder.decode(line)
+    except msgspec.ValidationError:
+        return json.loads(line)
+
+def _iter_events(paths: Iterable[Path]) -> Iterable[Union["_BinanceEvent", Dict[str, Any]]]:
+    if msgspec is None:
+        yield from _iter_jsonl_gz(paths)
+        return
+    for p in paths:
+        with gzip.open(p, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield _decode_event(line)
+
+def _book_rows(ts_ns: int, bids, asks) -> Iterable[Dict[str, Any]]:
+    for px, qty, *_ in bids:
+        yield {"ts": ts_ns, "side": "B", "price": float(px), "qty": float(qty), "type": "book"}
+    for px, qty, *_ in asks:
+        yield {"ts": ts_ns, "side": "A", "price": float(px), "qty": float(qty), "type": "book"}
+
+def _trade_row(ts_ns: int, price, qty, maker) -> Dict[str, Any]:
+    side = "S" if bool(maker) else "B"  # buyer is maker -> taker sold
+    return {"ts": ts_ns, "side": side, "price": float(price), "qty": float(qty), "type": "trade"}
+
+def _book_rows_from_binance_event(ev) -> Iterable[Dict[str, Any]]:
+    if not isinstance(ev, dict):
+        if isinstance(ev, _DepthUpdate):
+            yield from _book_rows(ev.E * 1_000_000, ev.b, ev.a)
+        return
     data = ev.get("data", ev)
     if data.get("e") != "depthUpdate":
         return
     ts_ns = int(data["E"]) * 1_000_000  # ms -> ns
-    for px, qty, *_ in data.get("b", []):
-        yield {"ts": ts_ns, "side": "B", "price": float(px), "qty": float(qty), "type": "book"}
-    for px, qty, *_ in data.get("a", []):
-        yield {"ts": ts_ns, "side": "A", "price": float(px), "qty": float(qty), "type": "book"}
+    yield from _book_rows(ts_ns, data.get("b", []), data.get("a", []))
 
-def _trade_rows_from_binance_event(ev: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+def _trade_rows_from_binance_event(ev) -> Iterable[Dict[str, Any]]:
+    if not isinstance(ev, dict):
+        if isinstance(ev, _Trade):
+            yield _trade_row(ev.T * 1_000_000, ev.p, ev.q, ev.m)
+        return
     data = ev.get("data", ev)
     if data.get("e") != "trade":
         return
     ts_ns = int(data["T"]) * 1_000_000  # ms -> ns
-    price = float(data["p"]); qty = float(data["q"])
-    side = "S" if bool(data.get("m")) else "B"  # buyer is maker -> taker sold
-    yield {"ts": ts_ns, "side": side, "price": price, "qty": qty, "type": "trade"}
+    yield _trade_row(ts_ns, data["p"], data["q"], data.get("m"))
 
 def normalize_day(
     date_str: str,
@@ -95,9 +155,9 @@ def normalize_day(
     trade_files = sorted(trades_dir.glob("trades-*.jsonl.gz"))
 
     rows: List[Dict[str, Any]] = []
-    for ev in _iter_jsonl_gz(depth_files):
+    for ev in _iter_events(depth_files):
         rows.extend(_book_rows_from_binance_event(ev) or [])
-    for ev in _iter_jsonl_gz(trade_files):
+    for ev in _iter_events(trade_files):
         rows.extend(_trade_rows_from_binance_event(ev) or [])
 
     if not rows:
@@ -10,6 +10,8 @@ import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+from .artifacts import find_artifact, read_frame
+
 
 def _ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
@@ -52,7 +54,7 @@ def _equity_from_pnl_csv(pnl_csv: Path) -> pd.DataFrame:
     Expect columns like: ts_ns, cash, inventory, equity  (names may vary slightly).
     We’ll try a few common patterns and fall back gracefully.
     """
-    df = pd.read_csv(pnl_csv)
+    df = read_frame(pnl_csv)
     # find time column
     ts_col = None
     for c in ["ts_ns", "ts", "timestamp", "time_ns", "time"]:
@@ -83,14 +85,14 @@ def _equity_from_pnl_csv(pnl_csv: Path) -> pd.DataFrame:
 
 def _equity_curve(best_run_dir: Path, out_png: Path) -> None:
     # locate PnL time series
-    pnl_csv = best_run_dir / "pnl_timeseries.csv"
-    if not pnl_csv.exists():
+    # pnl_timeseries.csv/.parquet, per the run's out_format
+    pnl_csv = find_artifact(best_run_dir, "pnl_timeseries")
+    if pnl_csv is None:
         # try a fallback naming: any matching file
-        cand = list(best_run_dir.glob("*pnl*csv"))
-        if not cand:
-            print(f"[equity_curve] no pnl_timeseries.csv in {best_run_dir}")
+        pnl_csv = find_artifact(best_run_dir, "*pnl*")
+        if pnl_csv is None:
+            print(f"[equity_curve] no pnl_timeseries table in {best_run_dir}")
             return
-        pnl_csv = cand[0]
 
     df = _equity_from_pnl_csv(pnl_csv)
 
@@ -117,13 +119,14 @@ def _equity_curve(best_run_dir: Path, out_png: Path) -> None:
 
 
 def _pnl_timeseries(best_run_dir: Path, out_png: Path) -> None:
-    pnl_csv = best_run_dir / "pnl_timeseries.csv"
-    if not pnl_csv.exists():
-        cand = list(best_run_dir.glob("*pnl*csv"))
-        if not cand:
-            print(f"[pnl_timeseries] no pnl_timeseries.csv in {best_run_dir}")
+    # pnl_timeseries.csv/.parquet, per the run's out_format
+    pnl_csv = find_artifact(best_run_dir, "pnl_timeseries")
+    if pnl_csv is None:
+        # try a fallback naming: any matching file
+        pnl_csv = find_artifact(best_run_dir, "*pnl*")
+        if pnl_csv is None:
+            print(f"[pnl_timeseries] no pnl_timeseries table in {best_run_dir}")
             return
-        pnl_csv = cand[0]
 
     df = _equity_from_pnl_csv(pnl_csv)
 
@@ -8,6 +8,8 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
+from .artifacts import read_frame, write_frame
+
 SECONDS_PER_YEAR_CRYPTO = 365 * 24 * 60 * 60
 
 @dataclass
@@ -18,6 +20,9 @@ class RiskInputs:
     out_summary_json: Path        # summary: pnl, drawdown, sharpe-like, turnover, etc.
     parent_side: Optional[str] = None   # "buy" | "sell" if fills don't include side column
     fee_bps: float = 0.0                 # if not already baked into fills (safety)
+    out_format: str = "csv"              # "csv" | "parquet" for out_table_csv
+    fills_df: Optional[pd.DataFrame] = None  # in-memory fills (skips re-reading fills_csv)
+    quotes_df: Optional[pd.DataFrame] = None # in-memory quotes (skips re-reading quotes_csv)
 
 def _as_ns(ts):
     ts = pd.to_datetime(ts, utc=True, errors="coerce")
@@ -38,8 +43,14 @@ def _mid_from_quotes(dfq: pd.DataFrame) -> pd.DataFrame:
     out = dfq[["ts_ns", "mid"]].dropna().sort_values("ts_ns").reset_index(drop=True)
     return out
 
-def _load_fills(path: Path, parent_side: Optional[str]) -> pd.DataFrame:
-    dff = pd.read_csv(path)
+def _load_quotes(path: Path, frame: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    if frame is None:
+        return _mid_from_quotes(pd.read_csv(path))
+    cols = [c for c in ("ts_ns", "ts", "mid", "bid_px", "ask_px") if c in frame.columns]
+    return _mid_from_quotes(frame[cols].copy())
+
+def _load_fills(path: Path, parent_side: Optional[str], frame: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    dff = frame.copy() if frame is not None else read_frame(path)
     cols = {c.lower(): c for c in dff.columns}
     # normalize columns
     if "ts_ns" not in dff.columns:
@@ -88,8 +99,8 @@ def _turnover(dff: pd.DataFrame) -> float:
     return float(total_notional / denom)
 
 def compute_pnl_and_risk(inp: RiskInputs) -> dict:
-    dfq = _mid_from_quotes(pd.read_csv(inp.quotes_csv))
-    dff = _load_fills(inp.fills_csv, inp.parent_side)
+    dfq = _load_quotes(inp.quotes_csv, inp.quotes_df)
+    dff = _load_fills(inp.fills_csv, inp.parent_side, inp.fills_df)
 
     # mid at each fill time (nearest quote at or before fill)
     dfq["ts_ns"] = dfq["ts_ns"].astype("int64")
@@ -193,8 +204,7 @@ def compute_pnl_and_risk(inp: RiskInputs) -> dict:
         "equity": eq_df["equity"],
     })
     out.sort_values("ts_ns", inplace=True)
-    inp.out_table_csv.parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(inp.out_table_csv, index=False)
+    write_frame(out, inp.out_table_csv, inp.out_format)
 
     summary = {
         "final_inventory": float(inv),
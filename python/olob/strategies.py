@@ -5,11 +5,15 @@ from typing import Dict, Any, Optional
 import numpy as np
 import pandas as pd
 import math
+import sys
 import datetime as dt
 
 Side = str  # "buy" or "sell"
 
-@dataclass
+# Immutable configs; __slots__ (3.10+) for cheaper attribute reads
+_FROZEN_DC = dict(frozen=True, slots=True) if sys.version_info >= (3, 10) else dict(frozen=True)
+
+@dataclass(**_FROZEN_DC)
 class CostModel:
     tick: float = 0.01         # price quant
     lot: float = 0.0001        # qty quant
@@ -25,7 +29,7 @@ class CostModel:
         lots = math.floor(qty / self.lot)
         return max(0.0, lots * self.lot)
 
-@dataclass
+@dataclass(**_FROZEN_DC)
 class StrategyConfig:
     name: str
     type: str                  # "twap" or "vwap"
@@ -51,6 +55,7 @@ class StrategyConfig:
 
 def parse_time_ns(s: str) -> int:
     # Accepts "YYYY-MM-DDTHH:MM:SS[.fff]Z" or with timezone-naive (assume UTC)
+    # Parses once; shared by the strategies and the backtest window.
     ts = pd.Timestamp(s)
     if ts.tz is None:
         ts = ts.tz_localize("UTC")
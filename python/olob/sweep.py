@@ -11,6 +11,12 @@ try:
 except ImportError:
     print("[err] PyYAML missing. pip install pyyaml", file=sys.stderr); raise
 
+# libyaml C loader/dumper when available (one load+dump per grid point)
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
 try:
     import matplotlib
     matplotlib.use("Agg")
@@ -69,11 +75,11 @@ def _build_slug(strategy_path: Path, overrides: Dict[str, Any], seed: int) -> st
 
 def _write_strategy_yaml(base_strategy: Path, overrides: Dict[str, Any], out_file: Path) -> None:
     with base_strategy.open("r") as f:
-        base_cfg = yaml.safe_load(f)
+        base_cfg = yaml.load(f, Loader=_YamlLoader)
     for k, v in overrides.items():
         _set_by_path(base_cfg, k, v)
     with out_file.open("w") as f:
-        yaml.safe_dump(base_cfg, f, sort_keys=False)
+        yaml.dump(base_cfg, f, Dumper=_YamlDumper, sort_keys=False)
 
 def _completed_sentinel(run_dir: Path) -> Path:
     return run_dir / "_SUCCESS"
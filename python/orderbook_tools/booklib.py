@@ -17,6 +17,17 @@ def to_ticks(price: Decimal, tick: Decimal) -> int:
 def from_ticks(ticks: int, tick: Decimal) -> Decimal:
     return (Decimal(ticks) * tick).normalize()
 
+def _bisect_desc(arr: List[int], key: int) -> int:
+    """bisect_left for a descending list: first index with arr[i] <= key."""
+    lo, hi = 0, len(arr)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if arr[mid] > key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
 @dataclass
 class TopLevel:
     price_ticks: int
@@ -34,6 +45,21 @@ class L2Book:
         self._asks: Dict[int, Decimal] = {}
         self._bids_px: List[int] = []  # descending
         self._asks_px: List[int] = []  # ascending
+        # price -> ticks; diffs keep re-touching the same levels, so most
+        # lookups skip the Decimal divide + quantize
+        self._ticks_memo: Dict[Decimal, int] = {}
+
+    # Live books touch a few thousand distinct prices; cleared when full so a
+    # long drifting session stays bounded (~11 MB at the cap)
+    _TICKS_MEMO_MAX = 1 << 16
+
+    def _ticks(self, px: Decimal) -> int:
+        t = self._ticks_memo.get(px)
+        if t is None:
+            if len(self._ticks_memo) >= self._TICKS_MEMO_MAX:
+                self._ticks_memo.clear()
+            t = self._ticks_memo[px] = to_ticks(px, self.tick)
+        return t
 
     # ---------- internals ----------
     def _set_level(self, side: Side, ticks: int, qty: Decimal):
@@ -52,27 +78,23 @@ class L2Book:
         book[ticks] = qty
         if not existed:
             if side == "B":
-                # keep descending by inserting using negated key
-                ins = bisect_left([-p for p in arr], -ticks)
+                # keep descending; O(log N) search, no negated copy of the ladder
+                ins = _bisect_desc(arr, ticks)
                 arr.insert(ins, ticks)
             else:
                 ins = bisect_left(arr, ticks)
                 arr.insert(ins, ticks)
 
-        # trim if needed
+        # trim if needed (drop only the levels past max_depth)
         if len(arr) > self.max_depth:
-            if side == "B":
-                arr[:] = arr[:self.max_depth]
-                self._bids = {p: self._bids[p] for p in arr}
-            else:
-                arr[:] = arr[:self.max_depth]
-                self._asks = {p: self._asks[p] for p in arr}
+            for p in arr[self.max_depth:]:
+                del book[p]
+            del arr[self.max_depth:]
 
     @staticmethod
     def _index_of(arr: List[int], key: int, side: Side) -> Optional[int]:
         if side == "B":
-            neg = [-p for p in arr]
-            j = bisect_left(neg, -key)
+            j = _bisect_desc(arr, key)
             if 0 <= j < len(arr) and arr[j] == key:
                 return j
             return None
@@ -81,23 +103,51 @@ class L2Book:
             return j
         return None
 
+    def _load_side(self, side: Side, levels: List[Tuple[Decimal, Decimal]]):
+        # Bulk path for snapshots: build the level map, then sort and trim
+        # once instead of a sorted insert per level.
+        book: Dict[int, Decimal] = {}
+        ticks = self._ticks
+        deletes = False
+        for px, qty in levels:
+            t = ticks(px)
+            if qty <= 0:
+                book.pop(t, None)
+                deletes = True
+            else:
+                book[t] = qty
+        if deletes and len(levels) > self.max_depth:
+            # levels trimmed before a later delete stay dropped; replay the
+            # per-level insert + trim to keep that order-dependent result
+            if side == "B":
+                self._bids, self._bids_px = {}, []
+            else:
+                self._asks, self._asks_px = {}, []
+            for px, qty in levels:
+                self._set_level(side, ticks(px), qty)
+            return
+        arr = sorted(book, reverse=(side == "B"))[:self.max_depth]
+        if len(arr) < len(book):
+            book = {p: book[p] for p in arr}
+        if side == "B":
+            self._bids, self._bids_px = book, arr
+        else:
+            self._asks, self._asks_px = book, arr
+
     # ---------- public ----------
     def apply_snapshot(self, bids: List[Tuple[Decimal, Decimal]],
                        asks: List[Tuple[Decimal, Decimal]]):
-        self._bids.clear(); self._asks.clear()
-        self._bids_px.clear(); self._asks_px.clear()
-        for px, qty in bids:
-            self._set_level("B", to_ticks(px, self.tick), qty)
-        for px, qty in asks:
-            self._set_level("A", to_ticks(px, self.tick), qty)
+        self._load_side("B", bids)
+        self._load_side("A", asks)
 
     def apply_updates(self,
                       bids: List[Tuple[Decimal, Decimal]],
                       asks: List[Tuple[Decimal, Decimal]]):
+        ticks, set_level = self._ticks, self._set_level
         for px, qty in bids:
-            self._set_level("B", to_ticks(px, self.tick), qty)
+            set_level("B", ticks(px), qty)
         for px, qty in asks:
-            self._set_level("A", to_ticks(px, self.tick), qty)
+            set_level("A", ticks(px), qty)
 
     def best_bid(self) -> Optional[TopLevel]:
         if not self._bids_px: return None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import os, gzip, json, argparse, glob
+from operator import itemgetter
 from decimal import Decimal
 from typing import List, Dict, Any, Tuple, Optional
 
@@ -142,7 +143,11 @@ def _coerce_int(x) -> int:
     # floats are unexpected here but be robust
     return int(x)
 
-def _parse_diff_msg(obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+# Parsed diff: (u, E, U, bids, asks) -- a flat tuple, since a whole day of
+# diffs is held in memory before sorting and replay.
+DiffMsg = Tuple[int, int, int, List[Tuple[Decimal, Decimal]], List[Tuple[Decimal, Decimal]]]
+
+def _parse_diff_msg(obj: Dict[str, Any]) -> Optional[DiffMsg]:
     """
     Accept common Binance spot/futures depth update forms:
       {"e":"depthUpdate","E":169..., "U":123, "u":140, "b":[["p","q"],...], "a":[["p","q"],...]}
@@ -186,7 +191,7 @@ def _parse_diff_msg(obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         # unexpected structure
         return None
 
-    return {"E": E, "U": U, "u": u, "b": b, "a": a}
+    return (u, E, U, b, a)
 
 # ---------- reconstruction ----------
 def _emit_record(book: L2Book, E: int, u: int, expected: int, applied: bool,
@@ -272,13 +277,13 @@ def reconstruct(raw_dir: str, date: str, exchange: str, symbol: str,
     expected = first_last_id + 1
 
     # Load diffs (from all files), sort by (u,E)
-    diffs: List[Dict[str, Any]] = []
+    diffs: List[DiffMsg] = []
     for p in diffs_files:
         for obj in _iter_diff_objects(p):
             m = _parse_diff_msg(obj)
             if m:
                 diffs.append(m)
-    diffs.sort(key=lambda x: (x["u"], x["E"]))
+    diffs.sort(key=itemgetter(0, 1))
 
     if debug:
         print(f"[reconstruct] parsed diffs: {len(diffs)}")
@@ -294,8 +299,7 @@ def reconstruct(raw_dir: str, date: str, exchange: str, symbol: str,
     drops = gaps = resyncs = 0
     snap_idx = 0
 
-    for msg in diffs:
-        U, u, E = msg["U"], msg["u"], msg["E"]
+    for u, E, U, mb, ma in diffs:
         if u < expected:
             drops += 1
             continue
@@ -317,7 +321,7 @@ def reconstruct(raw_dir: str, date: str, exchange: str, symbol: str,
                 continue
 
         # apply
-        book.apply_updates(msg["b"], msg["a"])
+        book.apply_updates(mb, ma)
         expected = u + 1
         records.append(_emit_record(book, E, u, expected, True, "ok",
                                     drops, gaps, resyncs, levels))
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from olob.artifacts import artifact_suffix, find_artifact, read_frame, summary_fills_path, write_frame
+from olob.backtest import run_backtest
+from olob.crashcheck import _fills_for
+
+
+def _frame():
+    return pd.DataFrame({
+        "ts_ns": np.array([1, 2], dtype="int64"),
+        "px": [100.0, 100.125],
+        "qty": [0.0, 1.5],
+        "pnl": [np.nan, -2.0],
+        "ts": pd.to_datetime([1, 2], unit="s", utc=True),
+    })
+
+
+def test_csv_artifact_bytes_unchanged(tmp_path):
+    path = write_frame(_frame(), tmp_path / "fills.csv")
+    assert path.read_bytes() == (
+        b"ts_ns,px,qty,pnl,ts\n"
+        b"1,100.0,0.0,,1970-01-01 00:00:01+00:00\n"
+        b"2,100.125,1.5,-2.0,1970-01-01 00:00:02+00:00\n"
+    )
+    assert path.read_bytes() == _frame().to_csv(index=False).encode()
+
+
+def test_parquet_artifact_roundtrip(tmp_path):
+    df = _frame()
+    path = write_frame(df, tmp_path / "fills.parquet", "parquet")
+    pd.testing.assert_frame_equal(read_frame(path), df)
+
+
+@pytest.mark.parametrize("out_format", ["csv", "parquet"])
+def test_backtest_artifacts_found_in_either_format(tmp_path, out_format):
+    t0 = 1_735_689_600_000_000_000  # 2025-01-01T00:00:00Z
+    n = 600
+    quotes = pd.DataFrame({
+        "ts_ns": t0 + np.arange(n, dtype="int64") * 1_000_000_000,
+        "bid_px": 100.0, "bid_sz": 5.0, "ask_px": 100.01, "ask_sz": 5.0,
+    })
+    quotes.to_csv(tmp_path / "quotes.csv", index=False)
+    (tmp_path / "twap.yaml").write_text(yaml.safe_dump({
+        "name": "twap", "type": "twap", "side": "buy", "qty": 2.0, "bar_sec": 60,
+        "start": "2025-01-01T00:00:00Z", "end": "2025-01-01T00:10:00Z",
+        "out_format": out_format,
+        "cost": {"taker_bps": 1.0, "tick_size": 0.01, "lot_size": 0.01},
+    }))
+    out = tmp_path / "out"
+    summary = run_backtest(str(tmp_path / "twap.yaml"), str(tmp_path / "quotes.csv"), None, str(out))
+
+    fills = summary_fills_path(summary)
+    assert fills.suffix == artifact_suffix(out_format)
+    assert ("fills_csv" in summary) == (out_format == "csv")
+    assert _fills_for(out) == fills
+    assert read_frame(fills)["qty"].sum() > 0
+    assert find_artifact(out, "pnl_timeseries").suffix == artifact_suffix(out_format)
@@ -0,0 +1,22 @@
+import pyarrow as pa
+import pytest
+
+from olob import backtest as bt
+
+
+@pytest.mark.parametrize("body", ["\n\n", "ts_ns,qty\n"])
+def test_empty_trades_csv_means_no_trades(tmp_path, body):
+    p = tmp_path / "trades.csv"
+    p.write_text(body)
+    assert bt._read_trades(str(p)) is None
+
+
+@pytest.mark.parametrize("body", [
+    "ts_ns,qty\n1,0.5\n2,0.5,9\n",  # extra field
+    "ts_ns,qty\nabc,0.5\n",         # bad timestamp
+])
+def test_malformed_trades_csv_raises(tmp_path, body):
+    p = tmp_path / "trades.csv"
+    p.write_text(body)
+    with pytest.raises(pa.ArrowInvalid):
+        bt._read_trades(str(p))
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from olob import backtest as bt
+from olob.strategies import StrategyConfig, TWAPStrategy, VWAPStrategy, parse_time_ns
+
+START = "2025-01-01T00:00:00Z"
+END = "2025-01-01T00:10:00Z"
+
+
+def _market(seed=7):
+    rng = np.random.default_rng(seed)
+    t0 = parse_time_ns(START)
+    n = 2000
+    # irregular gaps, including repeated timestamps
+    gaps = rng.choice([0, 50, 150, 400], size=n, p=[0.1, 0.4, 0.3, 0.2]) * 1_000_000
+    ts = t0 + np.cumsum(gaps).astype(np.int64)
+    mid = 100.0 + np.cumsum(rng.normal(0.0, 0.01, size=n))
+    bid_sz = rng.choice([0.05, 0.3, 2.0, np.nan], size=n)
+    ask_sz = rng.choice([0.05, 0.3, 2.0, np.nan], size=n)
+    quotes = pd.DataFrame({
+        "ts_ns": ts,
+        "bid_px": mid - 0.005, "bid_sz": bid_sz,
+        "ask_px": mid + 0.005, "ask_sz": ask_sz,
+    })
+    k = 300
+    trades = pd.DataFrame({
+        "ts_ns": np.sort(rng.choice(ts, size=k)),
+        "qty": rng.choice([0.5, 1.0, 4.0], size=k),
+    })
+    return quotes, trades
+
+
+def _reference_fills(cfg, quotes, trades):
+    # Per-tick strategy-object loop the kernel replaces
+    start_ns, end_ns = parse_time_ns(cfg["start"]), parse_time_ns(cfg["end"])
+    q = quotes[(quotes["ts_ns"] >= start_ns) & (quotes["ts_ns"] < end_ns)].reset_index(drop=True)
+    cost = bt._cost_from_yaml_dict(cfg["cost"])
+    sc = StrategyConfig(
+        name=cfg["type"], type=cfg["type"], side=cfg["side"], qty=cfg["qty"],
+        start=cfg["start"], end=cfg["end"], bar_sec=cfg["bar_sec"],
+        min_clip=cfg["min_clip"], cooldown_ms=cfg["cooldown_ms"],
+    )
+    strat = TWAPStrategy(sc) if cfg["type"] == "twap" else VWAPStrategy(sc, trades)
+
+    ts = q["ts_ns"].to_numpy(dtype=np.int64)
+    cols = [q[c].to_numpy(dtype=np.float64) for c in ("bid_px", "bid_sz", "ask_px", "ask_sz")]
+    arrive = bt._apply_latency(ts, cost.fixed_latency_ms)
+    bar_ns = cfg["bar_sec"] * 1_000_000_000
+    total_bars = max(1, int(np.ceil((end_ns - start_ns) / bar_ns)))
+    cooldown_ns = cfg["cooldown_ms"] * 1_000_000
+
+    fills = []
+    last_bar_idx, last_send_ns, sent_in_bar = -1, None, False
+    for i in range(len(ts)):
+        now_ns = int(ts[i])
+        bar_idx = (now_ns - start_ns) // bar_ns
+        if bar_idx != last_bar_idx:
+            strat.on_bar(now_ns)
+            last_bar_idx, sent_in_bar = bar_idx, False
+        remaining = strat.remaining()
+        if remaining <= 0:
+            break
+        desired = cost.quant_qty(float(np.clip(strat.on_tick(now_ns), 0.0, remaining)))
+        if desired <= 0.0 and not sent_in_bar:
+            planned = max(cfg["min_clip"], remaining / max(1, total_bars - bar_idx))
+            desired = cost.quant_qty(min(planned, remaining))
+        if desired <= 0.0:
+            continue
+        if cooldown_ns > 0 and last_send_ns is not None and now_ns - last_send_ns < cooldown_ns:
+            continue
+        j = int(arrive[i])
+        if j >= len(ts):
+            break
+        child_qty, px, _ = bt._fill_at_idx(j, cfg["side"] == "buy", desired, cost, *cols)
+        if child_qty > 0:
+            fills.append((int(ts[j]), px, child_qty))
+            strat.on_fill(child_qty, px)
+            last_send_ns, sent_in_bar = now_ns, True
+    return pd.DataFrame(fills, columns=["ts_ns", "px", "qty"])
+
+
+@pytest.mark.parametrize("jit", [True, False])
+@pytest.mark.parametrize("stype", ["twap", "vwap"])
+@pytest.mark.parametrize("side", ["buy", "sell"])
+@pytest.mark.parametrize("latency_ms,cooldown_ms,min_clip", [
+    (0, 0, 0.0),
+    (0, 0, 0.5),
+    (120, 0, 0.01),
+    (120, 2500, 0.2),
+])
+def test_kernel_matches_strategy_objects(tmp_path, monkeypatch, jit, stype, side,
+                                         latency_ms, cooldown_ms, min_clip):
+    if jit and not bt._HAVE_NUMBA:
+        pytest.skip("numba not installed")
+    if not jit and bt._HAVE_NUMBA:
+        monkeypatch.setattr(bt, "_run_loop_njit", bt._run_loop_njit.py_func)
+
+    quotes, trades = _market()
+    cfg = {
+        "type": stype, "side": side, "qty": 12.0, "start": START, "end": END,
+        "bar_sec": 60, "min_clip": min_clip, "cooldown_ms": cooldown_ms,
+        "cost": {"tick_size": 0.01, "lot_size": 0.01, "fixed_latency_ms": latency_ms},
+    }
+    _, got = bt._run_bar_loop_with_queue(dict(cfg), quotes, trades, tmp_path, seed=1)
+    want = _reference_fills(cfg, quotes, trades)
+
+    assert len(want) > 0
+    assert len(got) == len(want)
+    np.testing.assert_array_equal(got["ts_ns"].to_numpy(), want["ts_ns"].to_numpy())
+    np.testing.assert_allclose(got["px"].to_numpy(), want["px"].to_numpy(), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(got["qty"].to_numpy(), want["qty"].to_numpy(), rtol=0, atol=1e-9)
@@ -0,0 +1,52 @@
+import random
+from decimal import Decimal
+
+from orderbook_tools.booklib import L2Book, to_ticks
+
+
+class _SmallMemoBook(L2Book):
+    _TICKS_MEMO_MAX = 8
+
+
+def test_memo_ticks_match_to_ticks_across_clear():
+    tick = Decimal("0.01")
+    book = _SmallMemoBook(tick)
+    # revisit prices so lookups hit the memo before and after each clear
+    prices = [Decimal("100.00") + Decimal(i % 13) * tick for i in range(100)]
+    prices += [Decimal("100.10"), Decimal("100.1"), Decimal("100.005"), Decimal("99.994")]
+    for px in prices:
+        assert book._ticks(px) == to_ticks(px, tick)
+        assert len(book._ticks_memo) <= _SmallMemoBook._TICKS_MEMO_MAX
+
+
+def test_book_levels_unchanged_by_memo_clear():
+    tick = Decimal("0.5")
+    small, ref = _SmallMemoBook(tick), L2Book(tick)
+    for i in range(40):
+        bids = [(Decimal(100) - Decimal(j) / 2, Decimal(i + 1)) for j in range(i % 7, i % 7 + 5)]
+        asks = [(Decimal(101) + Decimal(j) / 2, Decimal(i + 2)) for j in range(i % 5, i % 5 + 5)]
+        small.apply_updates(bids, asks)
+        ref.apply_updates(bids, asks)
+        assert small.snapshot_tops(10) == ref.snapshot_tops(10)
+        assert small.checksum() == ref.checksum()
+
+
+def test_snapshot_matches_sequential_inserts():
+    rng = random.Random(3)
+    tick = Decimal("0.01")
+
+    def levels():
+        # duplicate prices and qty=0 deletes, as replayed/merged snapshots can carry
+        return [(Decimal(rng.randint(9000, 9100)) / 100, Decimal(rng.choice([0, 0, 1, 2, 3])) / 10)
+                for _ in range(rng.randint(0, 60))]
+
+    for max_depth in (5, 20, 5000):
+        for _ in range(50):
+            bids, asks = levels(), levels()
+            snap = L2Book(tick, max_depth)
+            snap.apply_updates(levels(), levels())
+            snap.apply_snapshot(bids, asks)
+            seq = L2Book(tick, max_depth)
+            seq.apply_updates(bids, asks)
+            assert (snap._bids, snap._bids_px, snap._asks, snap._asks_px) == \
+                   (seq._bids, seq._bids_px, seq._asks, seq._asks_px)
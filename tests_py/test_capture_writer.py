@@ -0,0 +1,97 @@
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp import web
+
+from olob.crypto import binance
+
+
+def _diff(i):
+    return json.dumps({"stream": "btcusdt@depth@100ms", "data": {
+        "e": "depthUpdate", "E": i, "U": i, "u": i, "b": [["100.0", "1.0"]], "a": []}})
+
+
+async def _serve(pump):
+    # Local stand-in for the exchange: a depth snapshot and a WS stream fed by pump(ws)
+    async def depth(_req):
+        return web.json_response({"lastUpdateId": 1, "bids": [["100.0", "1.0"]], "asks": [["101.0", "1.0"]]})
+
+    async def stream(req):
+        ws = web.WebSocketResponse()
+        await ws.prepare(req)
+        sender = asyncio.create_task(pump(ws))
+        async for _msg in ws:  # answers the client's close frame
+            pass
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/api/v3/depth", depth)
+    app.router.add_get("/stream", stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, binance.Endpoints(rest_base=f"http://127.0.0.1:{port}", ws_base=f"ws://127.0.0.1:{port}/stream")
+
+
+def _run_capture(tmp_path, monkeypatch, pump, minutes, timeout):
+    async def main():
+        runner, ep = await _serve(pump)
+        monkeypatch.setattr(binance, "_endpoints_for", lambda _exchange: ep)
+        capture = asyncio.ensure_future(binance._consumer_depth_and_trades(
+            symbol="BTCUSDT", raw_root=str(tmp_path), minutes=minutes,
+            snapshot_every_sec=600, exchange="binance",
+        ))
+        try:
+            done, _ = await asyncio.wait({capture}, timeout=timeout)
+            if not done:
+                capture.cancel()
+                await asyncio.gather(capture, return_exceptions=True)
+                pytest.fail("capture kept running past its deadline")
+            capture.result()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(main())
+
+
+def test_capture_fails_fast_when_writer_fails(tmp_path, monkeypatch):
+    def broken_write_many(self, lines):
+        raise OSError("disk full")
+
+    async def endless(ws):
+        i = 0
+        while not ws.closed:
+            await ws.send_str(_diff(i))
+            i += 1
+            if i % 64 == 0:
+                await asyncio.sleep(0)
+
+    monkeypatch.setattr(binance.JsonlGzWriter, "write_many", broken_write_many)
+    with pytest.raises(OSError, match="disk full"):
+        _run_capture(tmp_path, monkeypatch, endless, minutes=1, timeout=20)
+
+
+def test_partial_batch_flushed_on_a_quiet_stream(tmp_path, monkeypatch):
+    sent_at = []
+    written_at = []
+    orig_write_many = binance.JsonlGzWriter.write_many
+
+    def timed_write_many(self, lines):
+        written_at.append(time.monotonic())
+        orig_write_many(self, lines)
+
+    async def one_then_quiet(ws):
+        sent_at.append(time.monotonic())
+        await ws.send_str(_diff(1))
+
+    monkeypatch.setattr(binance.JsonlGzWriter, "write_many", timed_write_many)
+    _run_capture(tmp_path, monkeypatch, one_then_quiet, minutes=2 / 60, timeout=20)
+
+    # handed off by the batch age limit, not by the end of the run
+    assert written_at and written_at[0] - sent_at[0] < 1.0
@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from olob import cli as olob_cli
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="uses a shell-script bench_tool")
+
+
+@pytest.fixture
+def bench_env(tmp_path, monkeypatch):
+    # Fake bench_tool that only understands "-n N"
+    exe = tmp_path / "bench_tool"
+    exe.write_text('#!/bin/sh\n[ "$1" = "-n" ] && [ -n "$2" ] && exit 0\necho usage >&2\nexit 2\n')
+    exe.chmod(0o755)
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(olob_cli, "_BENCH_CACHE_DIR", cache)
+    monkeypatch.setattr(olob_cli, "_find_bench_tool", lambda: str(exe))
+    return str(exe), cache / "bench_argv.json"
+
+
+def test_bench_probes_then_caches_form(bench_env):
+    exe, cache_file = bench_env
+    res = CliRunner().invoke(olob_cli.cli, ["bench", "--msgs", "10"])
+    assert res.exit_code == 0, res.output
+    assert json.loads(cache_file.read_text())["argv"] == ["-n", "{msgs}"]
+
+
+def test_bench_stale_cached_form_falls_back(bench_env, monkeypatch):
+    exe, cache_file = bench_env
+    olob_cli._store_cached_bench_argv(exe, ["--msgs", "{msgs}"])
+    monkeypatch.setattr(os, "execv", lambda *a: pytest.fail("execv on an unverified form"))
+
+    res = CliRunner().invoke(olob_cli.cli, ["bench", "--msgs", "10"])
+    assert res.exit_code == 0, res.output
+    data = json.loads(cache_file.read_text())
+    assert data["argv"] == ["-n", "{msgs}"] and data["verified"] is False
+
+    # Second hit succeeds as a child and marks the form known-good
+    res = CliRunner().invoke(olob_cli.cli, ["bench", "--msgs", "10"])
+    assert res.exit_code == 0, res.output
+    assert json.loads(cache_file.read_text())["verified"] is True
+
+
+def test_bench_cache_keyed_on_binary_identity(bench_env):
+    exe, cache_file = bench_env
+    olob_cli._store_cached_bench_argv(exe, ["-n", "{msgs}"], verified=True)
+    assert olob_cli._load_cached_bench_argv(exe) is not None
+    with open(exe, "a") as f:
+        f.write("# rebuilt\n")
+    assert olob_cli._load_cached_bench_argv(exe) is None
@@ -0,0 +1,18 @@
+import ast
+import importlib.util
+from pathlib import Path
+
+
+def test_single_cli_module_defines_bench_once():
+    spec = importlib.util.find_spec("olob.cli")
+    assert spec is not None and spec.origin
+    origin = Path(spec.origin)
+
+    # No shadow copies of cli.py anywhere under the package
+    pkg_root = origin.parent
+    assert [p for p in pkg_root.rglob("cli.py")] == [origin]
+
+    tree = ast.parse(origin.read_text())
+    names = [n.name for n in tree.body if isinstance(n, ast.FunctionDef)]
+    assert names.count("bench") == 1
+    assert names.count("_find_bench_tool") == 1
@@ -0,0 +1,57 @@
+import gzip
+import json
+
+import pytest
+
+from olob.crypto import common
+
+DEPTH = {"stream": "btcusdt@depth@100ms", "data": {
+    "e": "depthUpdate", "E": 1700000000123, "U": 1, "u": 2,
+    "b": [["100.5", "1.25"]], "a": [["101.0", "0"]]}}
+TRADE = {"stream": "btcusdt@trade", "data": {
+    "e": "trade", "E": 1700000000200, "T": 1700000000199, "p": "100.75", "q": "0.5", "m": True}}
+
+
+def _gz(path, frames):
+    with gzip.open(path, "wt") as f:
+        for fr in frames:
+            f.write(json.dumps(fr) + "\n")
+    return path
+
+
+def _rows(path, row_fn):
+    return [r for ev in common._iter_events([path]) for r in row_fn(ev)]
+
+
+@pytest.fixture(params=["msgspec", "dict"])
+def decoder(request, monkeypatch):
+    if request.param == "msgspec":
+        if common.msgspec is None:
+            pytest.skip("msgspec not installed")
+    else:
+        monkeypatch.setattr(common, "msgspec", None)
+    return request.param
+
+
+def test_rows_from_depth_and_trade_frames(tmp_path, decoder):
+    depth = _gz(tmp_path / "d.jsonl.gz", [DEPTH, {"e": "depthUpdate", "E": 5, "b": [], "a": [["1", "2"]]}])
+    trades = _gz(tmp_path / "t.jsonl.gz", [TRADE])
+    assert _rows(depth, common._book_rows_from_binance_event) == [
+        {"ts": 1700000000123_000_000, "side": "B", "price": 100.5, "qty": 1.25, "type": "book"},
+        {"ts": 1700000000123_000_000, "side": "A", "price": 101.0, "qty": 0.0, "type": "book"},
+        {"ts": 5_000_000, "side": "A", "price": 1.0, "qty": 2.0, "type": "book"},
+    ]
+    assert _rows(trades, common._trade_rows_from_binance_event) == [
+        {"ts": 1700000000199_000_000, "side": "S", "price": 100.75, "qty": 0.5, "type": "trade"},
+    ]
+
+
+@pytest.mark.parametrize("frame,missing,row_fn", [
+    (DEPTH, "E", common._book_rows_from_binance_event),
+    (TRADE, "T", common._trade_rows_from_binance_event),
+])
+def test_frame_without_event_time_raises(tmp_path, decoder, frame, missing, row_fn):
+    bad = {**frame, "data": {k: v for k, v in frame["data"].items() if k != missing}}
+    path = _gz(tmp_path / "x.jsonl.gz", [bad])
+    with pytest.raises(KeyError):
+        _rows(path, row_fn)